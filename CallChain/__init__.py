@@ -1,12 +1,43 @@
+import importlib
+from typing import TYPE_CHECKING
+
 from .core.core import Chain
+from .core.checkpoint import CheckpointStore, SQLiteCheckpointStore
+from .core.context import ContextPolicy, count_tokens
 from .models.openai import OpenAIModel
 from .models.groq import GroqModel
 from .models.base import Model
-from .audio import AudioTranscriber, AudioConfig, AudioProcessor
+
+if TYPE_CHECKING:
+    from .audio import AudioTranscriber, AudioConfig, AudioProcessor
+
+# Audio pulls in numpy, librosa, soundfile and the groq SDK, so it is only
+# imported on first attribute access (keeps `import CallChain` fast).
+_LAZY_ATTRS = {
+    "AudioTranscriber": ".audio",
+    "AudioConfig": ".audio",
+    "AudioProcessor": ".audio",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
 
 
 __all__ = [
     "Chain",
+    "CheckpointStore",
+    "SQLiteCheckpointStore",
+    "ContextPolicy",
+    "count_tokens",
     "OpenAIModel",
     "GroqModel",
     "Model",
@@ -1,7 +1,34 @@
-from .transcribe import AudioTranscriber
-from .config import AudioConfig
-from .processor import AudioProcessor
-from .clients import AudioClient, GroqAudioClient
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .transcribe import AudioTranscriber
+    from .config import AudioConfig
+    from .processor import AudioProcessor
+    from .clients import AudioClient, GroqAudioClient
+
+# Submodules are imported on first access so that e.g. AudioConfig does not
+# pay for loading librosa and numpy.
+_LAZY_ATTRS = {
+    "AudioTranscriber": ".transcribe",
+    "AudioConfig": ".config",
+    "AudioProcessor": ".processor",
+    "AudioClient": ".clients",
+    "GroqAudioClient": ".clients",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
+
 
 __all__ = [
     "AudioTranscriber", 
@@ -9,4 +36,4 @@ __all__ = [
     "AudioProcessor",
     "AudioClient",
     "GroqAudioClient"
-]
\ No newline at end of file
+]
@@ -1,6 +1,5 @@
 from typing import Protocol, Any, Optional
 import os
-from groq import Groq
 
 class AudioClient(Protocol):
     """
@@ -37,6 +36,8 @@ class GroqAudioClient:
             raise ValueError(
                 "No API key provided. Either pass it to the constructor or set GROQ_API_KEY environment variable."
             )
+        # Deferred so importing the audio package does not load the groq SDK
+        from groq import Groq
         self.client = Groq(api_key=self.api_key)
 
     def transcribe(
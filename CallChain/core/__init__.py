@@ -1,3 +1,13 @@
 from .core import Chain
+from .checkpoint import CheckpointStore, SQLiteCheckpointStore
+from .context import ContextPolicy, count_tokens, truncate_to_tokens, build_messages
 
-__all__ = ["Chain"]
\ No newline at end of file
+__all__ = [
+    "Chain",
+    "CheckpointStore",
+    "SQLiteCheckpointStore",
+    "ContextPolicy",
+    "count_tokens",
+    "truncate_to_tokens",
+    "build_messages"
+]
@@ -0,0 +1,167 @@
+import json
+import sqlite3
+import threading
+from typing import Protocol, Dict, Any, Optional
+
+def _to_json(value: Any, what: str) -> str:
+    """
+    Serialize a checkpoint value, raising a clear error if it is not JSON
+    or would not load back unchanged (e.g. tuples, non-string dict keys).
+    """
+    try:
+        data = json.dumps(value)
+    except TypeError as e:
+        raise ValueError(
+            f"{what} cannot be checkpointed: {e}. Checkpointed values must be JSON-serializable."
+        )
+    if json.loads(data) != value:
+        raise ValueError(
+            f"{what} cannot be checkpointed: it changes when stored as JSON "
+            "(use lists instead of tuples and string dict keys)."
+        )
+    return data
+
+class CheckpointStore(Protocol):
+    """
+    Protocol defining the interface for Chain checkpoint stores.
+
+    A checkpoint store persists the initial inputs and the output of every
+    completed step for a run id, so that a failed run can be resumed
+    without paying for the steps that already finished.
+    """
+    def save_inputs(self, run_id: str, inputs: Dict[str, Any]) -> None:
+        """
+        Start a run: persist its initial variables and discard any step
+        outputs previously stored under the same run id.
+        """
+        ...
+
+    def load_inputs(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Return the initial variables of a run, or None if unknown."""
+        ...
+
+    def save_step(self, run_id: str, step: str, output: Any) -> None:
+        """Persist the output of a completed step."""
+        ...
+
+    def load_steps(self, run_id: str) -> Dict[str, Any]:
+        """Return the outputs of all completed steps of a run."""
+        ...
+
+    def clear(self, run_id: str) -> None:
+        """Delete all checkpoints of a run."""
+        ...
+
+class SQLiteCheckpointStore:
+    """
+    A checkpoint store backed by a local SQLite database.
+
+    Every write is committed immediately, so outputs survive a crash of
+    the process running the chain. Inputs and outputs are stored as JSON,
+    so they must be JSON-serializable. Runs are kept until `clear` is called.
+    """
+    def __init__(self, path: str = "callchain_checkpoints.db"):
+        """
+        Initialize the SQLiteCheckpointStore.
+
+        Args:
+            path: Path to the SQLite database file (":memory:" for tests).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, inputs TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS steps ("
+                "run_id TEXT NOT NULL, step TEXT NOT NULL, output TEXT NOT NULL, "
+                "PRIMARY KEY (run_id, step))"
+            )
+
+    def save_inputs(self, run_id: str, inputs: Dict[str, Any]) -> None:
+        """
+        Start a run, discarding any earlier checkpoints under the same id.
+
+        Args:
+            run_id: The id of the run.
+            inputs: The initial variables of the run.
+
+        Raises:
+            ValueError: If the inputs cannot be stored as JSON unchanged.
+        """
+        data = _to_json(inputs, f"Inputs of run '{run_id}'")
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM steps WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, inputs) VALUES (?, ?)",
+                (run_id, data)
+            )
+
+    def load_inputs(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the initial variables of a run.
+
+        Args:
+            run_id: The id of the run.
+
+        Returns:
+            The stored variables, or None if the run id is unknown.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT inputs FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_step(self, run_id: str, step: str, output: Any) -> None:
+        """
+        Persist the output of a completed step.
+
+        Args:
+            run_id: The id of the run.
+            step: The name of the step.
+            output: The step output.
+
+        Raises:
+            ValueError: If the output cannot be stored as JSON unchanged.
+        """
+        data = _to_json(output, f"Output of step '{step}'")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO steps (run_id, step, output) VALUES (?, ?, ?)",
+                (run_id, step, data)
+            )
+
+    def load_steps(self, run_id: str) -> Dict[str, Any]:
+        """
+        Load the outputs of all completed steps of a run.
+
+        Args:
+            run_id: The id of the run.
+
+        Returns:
+            A dictionary mapping step names to their outputs.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step, output FROM steps WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {step: json.loads(output) for step, output in rows}
+
+    def clear(self, run_id: str) -> None:
+        """
+        Delete all checkpoints of a run.
+
+        Args:
+            run_id: The id of the run.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM steps WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
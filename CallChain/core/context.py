@@ -0,0 +1,124 @@
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+from CallChain.models.base import Model
+
+# Rough characters-per-token ratio used when no local tokenizer is installed
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=None)
+def _get_encoding(encoding: str) -> Any:
+    """
+    Load a tiktoken encoding, or return None if tiktoken is not installed
+    or the encoding cannot be loaded (it is downloaded on first use).
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding)
+    except Exception:
+        return None
+
+def count_tokens(text: str, encoding: str = "cl100k_base") -> int:
+    """
+    Count the tokens in a text with a local tokenizer.
+
+    Uses `tiktoken` if it is installed, otherwise falls back to an estimate
+    of one token per CHARS_PER_TOKEN characters.
+    """
+    enc = _get_encoding(encoding)
+    if enc is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(enc.encode(text))
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding: str = "cl100k_base") -> str:
+    """Keep only the first `max_tokens` tokens of a text."""
+    enc = _get_encoding(encoding)
+    if enc is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
+
+def template_fields(template: str) -> Set[str]:
+    """Return the variable names referenced by a str.format template."""
+    names = set()
+    for _, field_name, _, _ in string.Formatter().parse(template):
+        if field_name:
+            # "{a.b}" and "{a[0]}" both reference the variable "a"
+            names.add(field_name.split(".", 1)[0].split("[", 1)[0])
+    return names
+
+def build_messages(
+    prompt: str,
+    system: Optional[str] = None,
+    prefix: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Structure a prompt as chat messages: system, then stable prefix, then
+    the variable prompt.
+
+    Keeping the stable parts first and byte-identical across calls lets
+    provider-side prompt-prefix caching hit.
+    """
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    content = f"{prefix}\n\n{prompt}" if prefix else prompt
+    messages.append({"role": "user", "content": content})
+    return messages
+
+@dataclass
+class ContextPolicy:
+    """
+    Controls how outputs of earlier steps are inserted into a step's prompt.
+
+    Each earlier output longer than `max_tokens` is either truncated or,
+    with strategy "summarize", condensed by the `summarizer` model (and
+    truncated if the summary is still over budget).
+    """
+    max_tokens: Optional[int] = None
+    strategy: str = "truncate"
+    summarizer: Optional[Model] = None
+    summary_prompt: str = (
+        "Summarize the following text in at most {max_tokens} tokens, "
+        "keeping all facts needed by later steps:\n\n{text}"
+    )
+    encoding: str = "cl100k_base"
+
+    def __post_init__(self):
+        """Validate the strategy after initialization."""
+        if self.strategy not in ("truncate", "summarize"):
+            raise ValueError(f"Unknown context strategy '{self.strategy}'")
+        if self.strategy == "summarize" and self.summarizer is None:
+            raise ValueError("The 'summarize' strategy requires a summarizer model")
+
+    def apply(self, text: Any, cache: Optional[Dict[Any, str]] = None) -> Any:
+        """
+        Fit an earlier step output into the token budget.
+
+        Args:
+            text: The earlier step output.
+            cache: Optional dict reusing summaries; Chain passes one per run.
+        """
+        if self.max_tokens is None or not isinstance(text, str):
+            return text
+        if count_tokens(text, self.encoding) <= self.max_tokens:
+            return text
+
+        if self.strategy == "summarize":
+            # Summaries are cached so later steps reuse the same (stable) text
+            key = (id(self), text)
+            summary = cache.get(key) if cache is not None else None
+            if summary is None:
+                summary = self.summarizer.generate(
+                    self.summary_prompt.format(max_tokens=self.max_tokens, text=text)
+                )
+                if cache is not None:
+                    cache[key] = summary
+            text = summary
+        return truncate_to_tokens(text, self.max_tokens, self.encoding)
@@ -1,5 +1,8 @@
-from typing import Dict, Any, List, Union
+import uuid
+from typing import Dict, Any, List, Union, Optional
 from CallChain.models.base import Model, StringPromptTemplate, PromptTemplate
+from CallChain.core.checkpoint import CheckpointStore
+from CallChain.core.context import ContextPolicy, build_messages, template_fields
 
 class Chain:
     """
@@ -8,13 +11,38 @@ class Chain:
     The Chain class allows you to define a series of steps, where each step
     uses a model to generate text based on a PromptTemplate. The output of previous
     steps can be used in subsequent steps.
+
+    If a CheckpointStore is given, the output of every step is persisted
+    as soon as it completes, and a failed run can be resumed by its run id.
+    Checkpointed inputs must be JSON-serializable and load back unchanged
+    (lists rather than tuples, string dict keys), so a resumed run builds
+    the same prompts as the original one. Starting a run under an existing
+    id discards its earlier checkpoints. Checkpoints are never deleted
+    automatically: call `checkpoint.clear(run_id)` once a run (or, for a
+    batch, each record id "<batch_id>:<i>") is no longer needed.
     """
     
-    def __init__(self):
-        """Initialize an empty Chain."""
+    def __init__(self, checkpoint: Optional[CheckpointStore] = None):
+        """
+        Initialize an empty Chain.
+
+        Args:
+            checkpoint: Optional store used to persist step outputs per run id.
+        """
         self.steps: List[Dict[str, Any]] = []
+        self.checkpoint = checkpoint
+        self.run_id: Optional[str] = None
+        self.batch_id: Optional[str] = None
 
-    def step(self, name: str, model: Model, prompt_template: Union[str, Any]) -> 'Chain':
+    def step(
+        self,
+        name: str,
+        model: Model,
+        prompt_template: Union[str, Any],
+        context: Optional[ContextPolicy] = None,
+        system: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> 'Chain':
         """
         Add a step to the chain.
         
@@ -22,6 +50,10 @@ class Chain:
             name: The name of the step (used as key in results).
             model: The LLM model to use for this step.
             prompt_template: The prompt template (string or PromptTemplate object).
+            context: Optional policy fitting earlier step outputs to a token budget.
+            system: Optional system message, sent before the prompt.
+            prefix: Optional stable text sent before the formatted prompt, so
+                provider prompt-prefix caching can hit across calls.
             
         Returns:
             The Chain instance itself (for method chaining).
@@ -35,13 +67,19 @@ class Chain:
         self.steps.append({
             "name": name,
             "model": model,
-            "PromptTemplate": template_obj
+            "PromptTemplate": template_obj,
+            "context": context,
+            "system": system,
+            "prefix": prefix
         })
         return self
 
     def run(self, **kwargs) -> Dict[str, str]:
         """
         Execute the chain with the given initial context.
+
+        With a checkpoint store, the run is checkpointed under a new run id,
+        available as `self.run_id`, which can later be passed to `resume`.
         
         Args:
             **kwargs: Initial variables for the prompt PromptTemplate.
@@ -53,24 +91,120 @@ class Chain:
             ValueError: If a required variable is missing from the context.
             Exception: If a model fails to generate a response.
         """
-        
-        # Use a copy of kwargs to avoid modifying the original input dictionary
-        context = kwargs.copy()
+        return self._execute(kwargs.copy(), uuid.uuid4().hex if self.checkpoint else None)
+
+    def resume(self, run_id: str, /, **kwargs) -> Dict[str, str]:
+        """
+        Resume a checkpointed run, restoring the steps that already completed.
+
+        Args:
+            run_id: The id of the run to resume (see `self.run_id`).
+            **kwargs: Optional initial variables. They must match the ones
+                the run was started with; stored inputs are used otherwise.
+
+        Returns:
+            A dictionary containing the output of each step.
+
+        Raises:
+            ValueError: If there is no checkpoint store, the run id is
+                unknown, or the inputs differ from the checkpointed ones.
+        """
+        if not self.checkpoint:
+            raise ValueError("Cannot resume a run without a checkpoint store")
+        stored = self.checkpoint.load_inputs(run_id)
+        if stored is None:
+            raise ValueError(f"Unknown run id '{run_id}'")
+        changed = [k for k, v in kwargs.items() if k not in stored or stored[k] != v]
+        if changed:
+            raise ValueError(
+                f"Inputs {changed} differ from the ones run '{run_id}' was started with; "
+                "start a new run instead"
+            )
+        return self._execute(stored, run_id, self.checkpoint.load_steps(run_id))
+
+    def run_batch(
+        self,
+        records: List[Dict[str, Any]],
+        batch_id: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Execute the chain once per record.
+
+        With a checkpoint store, record `i` is checkpointed under the run id
+        "<batch_id>:<i>". The batch id is stored in `self.batch_id` before
+        the first record runs, so a failed batch can be passed to `resume_batch`.
+
+        Args:
+            records: The initial variables of each run.
+            batch_id: Batch id to checkpoint under (default: a new uuid).
+
+        Returns:
+            A list with the results of each record, in order.
+        """
+        self.batch_id = batch_id or uuid.uuid4().hex
+        return [
+            self._execute(record.copy(), f"{self.batch_id}:{i}" if self.checkpoint else None)
+            for i, record in enumerate(records)
+        ]
+
+    def resume_batch(self, batch_id: str, records: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Resume a checkpointed batch from its last completed record.
+
+        Completed records are restored from the checkpoint store, and the
+        records that never started are run.
+
+        Args:
+            batch_id: The id of the batch to resume (see `self.batch_id`).
+            records: The same records the batch was started with.
+
+        Returns:
+            A list with the results of each record, in order.
+
+        Raises:
+            ValueError: If there is no checkpoint store, the batch id is
+                unknown, or a record differs from its checkpointed inputs.
+        """
+        if not self.checkpoint:
+            raise ValueError("Cannot resume a batch without a checkpoint store")
+        if records and self.checkpoint.load_inputs(f"{batch_id}:0") is None:
+            raise ValueError(f"Unknown batch id '{batch_id}'")
+
+        self.batch_id = batch_id
+        results = []
+        for i, record in enumerate(records):
+            record_id = f"{batch_id}:{i}"
+            if self.checkpoint.load_inputs(record_id) is None:
+                results.append(self._execute(record.copy(), record_id))
+            else:
+                results.append(self.resume(record_id, **record))
+        return results
+
+    def _execute(
+        self,
+        context: Dict[str, Any],
+        run_id: Optional[str],
+        completed: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """Run every step, restoring completed ones and checkpointing new ones."""
         results = {}
+        # Summaries of earlier outputs are shared by the steps of this run only
+        summaries: Dict[Any, str] = {}
+
+        self.run_id = run_id
+        # A fresh run records its inputs; a resumed run already has them
+        if self.checkpoint and completed is None:
+            self.checkpoint.save_inputs(run_id, context)
+        completed = completed or {}
         
         for step in self.steps:
-            # Format the template with current context
-            try:
-                prompt = step["PromptTemplate"].format(**context)
-                print(f"--- Step: {step['name']} ---\nPrompt: {prompt}")
-            except KeyError as e:
-                raise ValueError(f"Missing variable {e} for step '{step['name']}'")
-            
-            # Generate response
-            try:
-                output = step["model"].generate(prompt)
-            except Exception as e:
-                raise Exception(f"Step '{step['name']}' failed: {str(e)}")
+            if step["name"] in completed:
+                print(f"--- Step: {step['name']} (restored from checkpoint) ---")
+                output = completed[step["name"]]
+            else:
+                output = self._run_step(step, context, results, summaries)
+                if self.checkpoint:
+                    self.checkpoint.save_step(run_id, step["name"], output)
             
             # Update context and results
             results[step["name"]] = output
@@ -78,6 +212,44 @@ class Chain:
             
         return results
 
+    def _run_step(
+        self,
+        step: Dict[str, Any],
+        context: Dict[str, Any],
+        outputs: Dict[str, Any],
+        summaries: Dict[Any, str]
+    ) -> str:
+        """Format the prompt of a single step and generate its output."""
+        # Fit the earlier step outputs the template uses to the step's token budget
+        if step["context"]:
+            template = getattr(step["PromptTemplate"], "template", None)
+            used = template_fields(template) if isinstance(template, str) else outputs.keys()
+            try:
+                context = {**context, **{
+                    k: step["context"].apply(v, summaries) for k, v in outputs.items() if k in used
+                }}
+            except Exception as e:
+                raise Exception(f"Step '{step['name']}' failed: {str(e)}")
+
+        # Format the template with current context
+        try:
+            prompt = step["PromptTemplate"].format(**context)
+            print(f"--- Step: {step['name']} ---\nPrompt: {prompt}")
+        except KeyError as e:
+            raise ValueError(f"Missing variable {e} for step '{step['name']}'")
+        
+        # Generate response
+        try:
+            if not (step["system"] or step["prefix"]):
+                return step["model"].generate(prompt)
+            messages = build_messages(prompt, step["system"], step["prefix"])
+            if hasattr(step["model"], "generate_messages"):
+                return step["model"].generate_messages(messages)
+            # Plain models get the same stable-first ordering in a single prompt
+            return step["model"].generate("\n\n".join(m["content"] for m in messages))
+        except Exception as e:
+            raise Exception(f"Step '{step['name']}' failed: {str(e)}")
+
 # Example usage
 # if __name__ == "__main__":
 #     from CallChain.models.groq import GroqModel
@@ -2,5 +2,6 @@ from CallChain.models.openai import OpenAIModel
 from CallChain.models.groq import GroqModel
 from CallChain.models.base import StringPromptTemplate
 from CallChain.models.base import PromptTemplate
+from CallChain.models.base import ChatModel
 
-__all__ = ["OpenAIModel", "GroqModel","StringPromptTemplate","PromptTemplate"]
+__all__ = ["OpenAIModel", "GroqModel","StringPromptTemplate","PromptTemplate", "ChatModel"]
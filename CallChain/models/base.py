@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Protocol, List, Dict
 
 class Model(Protocol):
     """
@@ -19,6 +19,22 @@ class Model(Protocol):
         """
         ...
 
+class ChatModel(Model, Protocol):
+    """
+    Protocol for Models that also accept structured chat messages.
+    """
+    def generate_messages(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Generate a response for the given chat messages.
+        
+        Args:
+            messages: A list of {"role": ..., "content": ...} dictionaries.
+            
+        Returns:
+            The generated text response.
+        """
+        ...
+
 class PromptTemplate(Protocol):
     """
     Protocol defining the interface for Prompt Templates.
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Optional, List, Dict
 from .base import Model
 
 class GroqModel:
@@ -41,13 +41,28 @@ class GroqModel:
         Returns:
             The content of the model's response.
             
+        Raises:
+            Exception: If the API call fails.
+        """
+        return self.generate_messages([{"role": "user", "content": prompt}])
+
+    def generate_messages(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Generate text from structured chat messages using Groq's API.
+        
+        Args:
+            messages: A list of {"role": ..., "content": ...} dictionaries.
+            
+        Returns:
+            The content of the model's response.
+            
         Raises:
             Exception: If the API call fails.
         """
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
-                messages=[{"role": "user", "content": prompt}]
+                messages=messages
             )
             return response.choices[0].message.content or ""
         except Exception as e:
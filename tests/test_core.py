@@ -1,6 +1,6 @@
 import pytest
-from unittest.mock import MagicMock
-from CallChain import Chain, Model
+from unittest.mock import MagicMock, patch
+from CallChain import Chain, Model, SQLiteCheckpointStore, ContextPolicy, count_tokens
 
 class MockModel:
     def generate(self, prompt: str) -> str:
@@ -29,3 +29,238 @@ def test_missing_variable():
     
     with pytest.raises(ValueError, match="Missing variable"):
         chain.run(name="World")
+
+class FlakyModel:
+    def __init__(self, fail_on: str):
+        self.fail_on = fail_on
+        self.prompts = []
+
+    def generate(self, prompt: str) -> str:
+        if self.fail_on in prompt:
+            raise RuntimeError("boom")
+        self.prompts.append(prompt)
+        return f"out({prompt})"
+
+def test_resume_skips_completed_steps(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "ckpt.db"))
+    model = FlakyModel(fail_on="Second")
+    chain = Chain(checkpoint=store)
+    chain.step("step1", model, "First {name}")
+    chain.step("step2", model, "Second {step1}")
+
+    with pytest.raises(Exception, match="Step 'step2' failed"):
+        chain.run(name="World")
+    run_id = chain.run_id
+    assert store.load_steps(run_id) == {"step1": "out(First World)"}
+
+    # Fix the model and resume: step1 must not be called again
+    model.fail_on = "never"
+    model.prompts.clear()
+    results = chain.resume(run_id)
+
+    assert model.prompts == ["Second out(First World)"]
+    assert results == {
+        "step1": "out(First World)",
+        "step2": "out(Second out(First World))",
+    }
+
+def test_resume_without_store():
+    chain = Chain()
+    chain.step("step1", MockModel(), "Hello {name}")
+    with pytest.raises(ValueError, match="checkpoint store"):
+        chain.resume("run-1", name="World")
+
+def test_resume_unknown_run_id(tmp_path):
+    chain = Chain(checkpoint=SQLiteCheckpointStore(str(tmp_path / "ckpt.db")))
+    chain.step("step1", MockModel(), "Hello {name}")
+    with pytest.raises(ValueError, match="Unknown run id 'nope'"):
+        chain.resume("nope")
+
+def test_resume_rejects_changed_inputs(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "ckpt.db"))
+    chain = Chain(checkpoint=store)
+    chain.step("step1", MockModel(), "Hello {name}")
+    chain.run(name="World")
+
+    # Same inputs are accepted, different ones would mix outputs
+    assert chain.resume(chain.run_id, name="World")["step1"] == "Mock response to: Hello World"
+    with pytest.raises(ValueError, match="differ"):
+        chain.resume(chain.run_id, name="Moon")
+
+def test_run_accepts_reserved_looking_variables(tmp_path):
+    model = MockModel()
+    for chain in (Chain(), Chain(checkpoint=SQLiteCheckpointStore(str(tmp_path / "ckpt.db")))):
+        chain.step("s", model, "id={run_id} resume={resume} batch={batch_id}")
+        results = chain.run(run_id="abc", resume="r", batch_id="b")
+        assert results["s"] == "Mock response to: id=abc resume=r batch=b"
+
+def test_non_json_inputs_give_clear_error(tmp_path):
+    import datetime
+    chain = Chain(checkpoint=SQLiteCheckpointStore(str(tmp_path / "ckpt.db")))
+    chain.step("s", MockModel(), "{d}")
+    with pytest.raises(ValueError, match="JSON-serializable"):
+        chain.run(d=datetime.date.today())
+    # Without a store any input still works
+    assert Chain().step("s", MockModel(), "{d}").run(d=datetime.date(2024, 1, 2))["s"].endswith("2024-01-02")
+
+def test_batch_resume_from_last_completed_record(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "ckpt.db"))
+    model = FlakyModel(fail_on="c")
+    chain = Chain(checkpoint=store)
+    chain.step("echo", model, "{item}")
+    records = [{"item": "a"}, {"item": "b"}, {"item": "c"}]
+
+    # The batch id is generated, and still available after the failure
+    with pytest.raises(Exception):
+        chain.run_batch(records)
+    assert store.load_inputs(f"{chain.batch_id}:1") == {"item": "b"}
+
+    model.fail_on = "never"
+    model.prompts.clear()
+    results = chain.resume_batch(chain.batch_id, records)
+
+    assert model.prompts == ["c"]
+    assert [r["echo"] for r in results] == ["out(a)", "out(b)", "out(c)"]
+
+class RecordingChatModel:
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, prompt: str) -> str:
+        self.calls.append(prompt)
+        return "x" * 400
+
+    def generate_messages(self, messages):
+        self.calls.append(messages)
+        return "done"
+
+def test_context_truncates_earlier_outputs():
+    model = RecordingChatModel()
+    chain = Chain()
+    chain.step("long", model, "Write a lot about {topic}")
+    chain.step("short", MockModel(), "Use {long}", context=ContextPolicy(max_tokens=10))
+
+    results = chain.run(topic="cats")
+
+    # The full output is kept in results, only the prompt is trimmed
+    assert results["long"] == "x" * 400
+    used = results["short"].removeprefix("Mock response to: Use ")
+    assert 0 < count_tokens(used) <= 10
+
+def test_context_summarizes_earlier_outputs():
+    summarizer = MagicMock()
+    summarizer.generate.return_value = "tiny summary"
+    chain = Chain()
+    chain.step("long", RecordingChatModel(), "Write a lot about {topic}")
+    chain.step(
+        "short", MockModel(), "Use {long}",
+        context=ContextPolicy(max_tokens=10, strategy="summarize", summarizer=summarizer)
+    )
+
+    results = chain.run(topic="cats")
+
+    assert results["short"] == "Mock response to: Use tiny summary"
+    summarizer.generate.assert_called_once()
+
+def test_context_summarizes_only_referenced_outputs_once_per_run():
+    summarizer = MagicMock()
+    summarizer.generate.return_value = "tiny summary"
+    policy = ContextPolicy(max_tokens=10, strategy="summarize", summarizer=summarizer)
+    chain = Chain()
+    chain.step("a", RecordingChatModel(), "A {topic}")
+    chain.step("b", RecordingChatModel(), "B {topic}")
+    chain.step("c", RecordingChatModel(), "C {topic}")
+    chain.step("d", MockModel(), "Use {c}", context=policy)
+    chain.step("e", MockModel(), "Again {c}", context=policy)
+
+    results = chain.run(topic="cats")
+
+    # Only {c} is referenced, and its summary is reused by step e
+    assert results["d"] == "Mock response to: Use tiny summary"
+    assert summarizer.generate.call_count == 1
+
+    # The cache is scoped to a run: a second run summarizes again
+    chain.run(topic="dogs")
+    assert summarizer.generate.call_count == 2
+
+def test_context_summarizer_failure_names_step():
+    summarizer = MagicMock()
+    summarizer.generate.side_effect = RuntimeError("rate limited")
+    chain = Chain()
+    chain.step("long", RecordingChatModel(), "Write a lot about {topic}")
+    chain.step(
+        "short", MockModel(), "Use {long}",
+        context=ContextPolicy(max_tokens=10, strategy="summarize", summarizer=summarizer)
+    )
+
+    with pytest.raises(Exception, match="Step 'short' failed: rate limited"):
+        chain.run(topic="cats")
+
+def test_count_tokens_falls_back_when_encoding_unavailable():
+    from CallChain.core import context
+    fake_tiktoken = MagicMock()
+    fake_tiktoken.get_encoding.side_effect = OSError("offline")
+    context._get_encoding.cache_clear()
+    try:
+        with patch.dict("sys.modules", {"tiktoken": fake_tiktoken}):
+            assert count_tokens("x" * 40, encoding="offline-test") == 10
+    finally:
+        context._get_encoding.cache_clear()
+
+def test_context_summarize_requires_model():
+    with pytest.raises(ValueError, match="summarizer"):
+        ContextPolicy(max_tokens=10, strategy="summarize")
+
+def test_system_and_prefix_are_sent_first():
+    model = RecordingChatModel()
+    chain = Chain()
+    chain.step("answer", model, "Question: {q}", system="Be brief.", prefix="Shared instructions")
+
+    chain.run(q="why?")
+
+    assert model.calls[0] == [
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "Shared instructions\n\nQuestion: why?"},
+    ]
+
+def test_reused_batch_id_discards_old_outputs(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "ckpt.db"))
+    day = {"tag": "day1"}
+    fail = {"on": "never"}
+
+    class DayModel:
+        def generate(self, prompt: str) -> str:
+            if fail["on"] in prompt:
+                raise RuntimeError("boom")
+            return f"{day['tag']}:{prompt}"
+
+    chain = Chain(checkpoint=store)
+    chain.step("a", DayModel(), "A {x}")
+    chain.step("b", DayModel(), "B {x}")
+    records = [{"x": "x"}]
+    chain.run_batch(records, batch_id="nightly")
+
+    # Night 2 reuses the batch id and fails on step b
+    day["tag"], fail["on"] = "day2", "B"
+    with pytest.raises(Exception):
+        chain.run_batch(records, batch_id="nightly")
+
+    fail["on"] = "never"
+    results = chain.resume_batch("nightly", records)
+    assert results == [{"a": "day2:A x", "b": "day2:B x"}]
+
+def test_inputs_changed_by_json_are_rejected(tmp_path):
+    chain = Chain(checkpoint=SQLiteCheckpointStore(str(tmp_path / "ckpt.db")))
+    chain.step("s", MockModel(), "{x}")
+    with pytest.raises(ValueError, match="changes when stored as JSON"):
+        chain.run(x=(1, 2))
+    assert chain.run(x=[1, 2])["s"] == "Mock response to: [1, 2]"
+
+def test_clear_removes_run(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "ckpt.db"))
+    chain = Chain(checkpoint=store)
+    chain.step("s", MockModel(), "{x}")
+    chain.run(x="y")
+    store.clear(chain.run_id)
+    assert store.load_inputs(chain.run_id) is None
+    assert store.load_steps(chain.run_id) == {}
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Budget for `import CallChain` in LLM-only usage, in seconds.
+# Override with CALLCHAIN_IMPORT_BUDGET on slow CI machines.
+IMPORT_BUDGET = float(os.getenv("CALLCHAIN_IMPORT_BUDGET", "0.25"))
+
+HEAVY_MODULES = ["numpy", "librosa", "soundfile", "groq", "openai"]
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import CallChain
+from CallChain import Chain, OpenAIModel, GroqModel
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def _run(script: str) -> list[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.splitlines()
+
+def test_import_does_not_load_heavy_dependencies():
+    _, loaded = _run(SCRIPT.format(heavy=HEAVY_MODULES))
+    assert loaded == ""
+
+def test_import_time_within_budget():
+    # Best of several fresh interpreters to smooth out disk-cache noise
+    timings = [float(_run(SCRIPT.format(heavy=HEAVY_MODULES))[0]) for _ in range(3)]
+    assert min(timings) < IMPORT_BUDGET, f"import CallChain took {min(timings):.3f}s"
+
+def test_audio_attributes_load_on_first_use():
+    pytest.importorskip("librosa")
+    script = (
+        "import sys, CallChain\n"
+        "assert 'librosa' not in sys.modules\n"
+        "from CallChain import AudioTranscriber\n"
+        "assert 'librosa' in sys.modules\n"
+        "assert CallChain.AudioConfig is CallChain.audio.config.AudioConfig\n"
+    )
+    _run(script)